@@ -55,3 +55,12 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         return {"username": username, "id": user_id}
     except JWTError:
         raise credentials_exception
+
+async def get_admin_user(current_user: dict = Depends(get_current_user)) -> dict:
+    """Require an administrator (see settings.admin_usernames)"""
+    if current_user["username"] not in settings.admin_usernames:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator privileges required",
+        )
+    return current_user
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from fastapi import Response
+from pydantic import TypeAdapter
+from config import settings
+
+Loader = Callable[[], Awaitable[bytes]]
+
+class RequestCoalescer:
+    """Single-flight layer for read endpoints.
+
+    Concurrent requests for the same namespace and normalized query share one
+    database call and the serialized response body it produced. Optionally the
+    body is kept for a short micro-cache window after the call completes.
+    """
+
+    def __init__(self, cache_ttl: float = 0.0, max_entries: int = 256):
+        self.cache_ttl = cache_ttl
+        self.max_entries = max_entries
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        # Every entry shares one TTL, so insertion order is also expiry order
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, bytes]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._stats = {"requests": 0, "executed": 0, "coalesced": 0, "cache_hits": 0, "invalidations": 0}
+
+    @staticmethod
+    def make_key(namespace: str, query: Dict[str, Any]) -> Tuple[str, str]:
+        """Normalize a query so equivalent filters map to the same key"""
+        return namespace, json.dumps(query, sort_keys=True, default=str)
+
+    async def fetch(self, namespace: str, query: Dict[str, Any], loader: Loader) -> bytes:
+        """Return the serialized body for a query, sharing in-flight work"""
+        key = self.make_key(namespace, query)
+        self._stats["requests"] += 1
+
+        cached = self._cache.get(key)
+        if cached:
+            expires_at, body = cached
+            if expires_at > time.monotonic():
+                self._stats["cache_hits"] += 1
+                return body
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["executed"] += 1
+            task = asyncio.ensure_future(self._run(key, loader))
+            self._inflight[key] = task
+
+        # Shield so a disconnecting client does not cancel the shared call
+        return await asyncio.shield(task)
+
+    async def _run(self, key: Tuple[str, str], loader: Loader) -> bytes:
+        namespace = key[0]
+        generation = self._generations.get(namespace, 0)
+        try:
+            body = await loader()
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+        # A write landed while we were reading; don't keep a possibly stale body
+        if self.cache_ttl > 0 and self._generations.get(namespace, 0) == generation:
+            self._store(key, body)
+        return body
+
+    def _store(self, key: Tuple[str, str], body: bytes):
+        now = time.monotonic()
+        self._cache.pop(key, None)
+        self._cache[key] = (now + self.cache_ttl, body)
+        # Prune expired entries from the front, then cap the size (oldest first)
+        while self._cache:
+            oldest_key, (expires_at, _) = next(iter(self._cache.items()))
+            if expires_at > now and len(self._cache) <= self.max_entries:
+                break
+            del self._cache[oldest_key]
+
+    def invalidate(self, namespace: str):
+        """Drop cached and in-flight entries after a write to a namespace"""
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        self._stats["invalidations"] += 1
+        for key in [k for k in self._cache if k[0] == namespace]:
+            del self._cache[key]
+        # Running calls still answer their current waiters, but new requests start fresh
+        for key in [k for k in self._inflight if k[0] == namespace]:
+            del self._inflight[key]
+
+    def invalidate_all(self):
+        """Drop everything, e.g. when invalidation events may have been missed"""
+        for namespace in {key[0] for key in list(self._cache) + list(self._inflight)} | set(self._generations):
+            self.invalidate(namespace)
+
+    def metrics(self) -> dict:
+        """Counters describing how many requests were deduplicated"""
+        stats = dict(self._stats)
+        stats["deduplicated"] = stats["coalesced"] + stats["cache_hits"]
+        stats["inflight"] = len(self._inflight)
+        stats["cached_entries"] = len(self._cache)
+        stats["cache_ttl_seconds"] = self.cache_ttl
+        return stats
+
+def serialize(adapter: TypeAdapter, documents: Any) -> bytes:
+    """Validate documents against a response model and dump them to JSON bytes"""
+    return adapter.dump_json(adapter.validate_python(documents))
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+coalescer = RequestCoalescer(
+    cache_ttl=settings.read_cache_ttl_seconds,
+    max_entries=settings.read_cache_max_entries,
+)
@@ -7,6 +7,19 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     jwt_expiration_hours: int = 24
     cors_origins: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
+    # Users allowed to run maintenance endpoints
+    admin_usernames: List[str] = ["admin"]
+    # Seconds to keep coalesced read responses around (0 disables the micro-cache)
+    read_cache_ttl_seconds: float = 0.0
+    # Upper bound on micro-cached responses (distinct queries)
+    read_cache_max_entries: int = 256
+    # How often the workload rollups are rebuilt from the tasks collection
+    workload_reconcile_interval_seconds: int = 3600
+    # Due-date scanner: run interval and how many days ahead counts as "due soon"
+    due_scan_interval_seconds: int = 900
+    due_soon_days: int = 2
+    # "local" for a single process, "mongo" to share cache invalidations across workers
+    invalidation_bus: str = "local"
     
     class Config:
         env_file = ".env"
@@ -49,3 +49,11 @@ async def get_history_collection():
 async def get_notifications_collection():
     database = await get_database()
     return database.notifications
+
+async def get_workload_collection():
+    database = await get_database()
+    return database.workload_rollups
+
+async def get_locks_collection():
+    database = await get_database()
+    return database.locks
@@ -0,0 +1,249 @@
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from pymongo import ASCENDING, UpdateOne
+from config import settings
+from database import get_tasks_collection, get_notifications_collection
+
+DONE_STATUS = "Completada"
+DUE_DATE_FORMAT = "%Y-%m-%d"
+# Free-form formats seen in legacy rows, tried in order
+LEGACY_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%Y/%m/%d", "%d-%m-%Y", "%d.%m.%Y")
+# Claims older than this without a digest are assumed to belong to a dead scan
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# due_stage is the next notice a task is waiting for ("upcoming", then
+# "overdue"). It is removed once nothing is pending (completed, unassigned,
+# no date, or overdue already sent), so those tasks leave the partial
+# (due_stage, due_at) index and scans only walk pending tasks.
+STAGE_EXPRESSION = {"$switch": {
+    "branches": [
+        {"case": {"$or": [
+            {"$eq": ["$status", DONE_STATUS]},
+            {"$lte": [{"$ifNull": ["$assigned_to", 0]}, 0]},
+            {"$ne": [{"$type": "$due_at"}, "date"]},
+            {"$in": ["overdue", {"$ifNull": ["$due_notices", []]}]},
+        ]}, "then": "$$REMOVE"},
+        {"case": {"$in": ["upcoming", {"$ifNull": ["$due_notices", []]}]}, "then": "overdue"},
+    ],
+    "default": "upcoming",
+}}
+
+def parse_due_date(value) -> Optional[datetime]:
+    """Parse a stored due date into a UTC midnight datetime, or None"""
+    if isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    if not value or not isinstance(value, str):
+        return None
+
+    value = value.strip()
+    for fmt in LEGACY_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return datetime(parsed.year, parsed.month, parsed.day)
+
+def normalize_due_date(value) -> Tuple[str, Optional[datetime]]:
+    """Return the canonical due_date string and the indexed due_at datetime.
+
+    Unparseable values are kept as-is so no user input is lost.
+    """
+    due_at = parse_due_date(value)
+    if due_at is None:
+        return (value or ""), None
+    return due_at.strftime(DUE_DATE_FORMAT), due_at
+
+def due_stage(task: dict) -> Optional[str]:
+    """Python twin of STAGE_EXPRESSION, for documents built in the app"""
+    notices = task.get("due_notices") or []
+    if (task.get("status") == DONE_STATUS or (task.get("assigned_to") or 0) <= 0
+            or not isinstance(task.get("due_at"), datetime) or "overdue" in notices):
+        return None
+    return "overdue" if "upcoming" in notices else "upcoming"
+
+def apply_due_date(task_dict: dict) -> dict:
+    """Normalize due_date in place and add due_at"""
+    task_dict["due_date"], task_dict["due_at"] = normalize_due_date(task_dict.get("due_date"))
+    return task_dict
+
+def new_task_tracking(task_dict: dict) -> dict:
+    """Initial scanner state for a freshly created task"""
+    task_dict["due_notices"] = []
+    stage = due_stage(task_dict)
+    if stage:
+        task_dict["due_stage"] = stage
+    return task_dict
+
+def task_update_pipeline(fields: dict) -> list:
+    """Update pipeline that sets user fields without clobbering scanner state.
+
+    Notices sent so far survive unless the due date moved, and due_stage is
+    recomputed from the stored document in the same atomic update, so a
+    concurrent scan claim is never lost.
+    """
+    due_at = fields.get("due_at")
+    user_fields = {name: {"$literal": value} for name, value in fields.items()}
+    user_fields["due_notices"] = {"$cond": [
+        {"$eq": [{"$ifNull": ["$due_at", None]}, {"$literal": due_at}]},
+        {"$ifNull": ["$due_notices", []]},
+        [],
+    ]}
+    return [{"$set": user_fields}, {"$set": {"due_stage": STAGE_EXPRESSION}}]
+
+async def ensure_due_date_indexes():
+    tasks_collection = await get_tasks_collection()
+    notifications_collection = await get_notifications_collection()
+    await tasks_collection.create_index(
+        [("due_stage", ASCENDING), ("due_at", ASCENDING)],
+        partialFilterExpression={"due_stage": {"$exists": True}},
+    )
+    await tasks_collection.create_index([("due_claim.run", ASCENDING)], sparse=True)
+    await tasks_collection.create_index([("due_claim.at", ASCENDING)], sparse=True)
+    await notifications_collection.create_index([("due_run", ASCENDING)], sparse=True)
+
+async def migrate_due_dates():
+    """Backfill due_at, canonical due_date and due_stage on older rows"""
+    tasks_collection = await get_tasks_collection()
+    query = {"$or": [
+        {"due_at": {"$exists": False}},
+        # Only rows that should be waiting for a notice but lack due_stage
+        {
+            "due_stage": {"$exists": False},
+            "due_at": {"$type": "date"},
+            "due_notices": {"$ne": "overdue"},
+            "status": {"$ne": DONE_STATUS},
+            "assigned_to": {"$gt": 0},
+        },
+    ]}
+    operations = []
+    async for task in tasks_collection.find(query):
+        normalized = "due_at" in task
+        due_date, due_at = normalize_due_date(task.get("due_date"))
+        task.update({"due_date": due_date, "due_at": due_at})
+        changes = {"due_date": due_date, "due_at": due_at}
+        stage = due_stage(task)
+        if stage:
+            changes["due_stage"] = stage
+        elif normalized:
+            # Already normalized and nothing pending; leave the row alone
+            continue
+        operations.append(UpdateOne({"_id": task["_id"]}, {"$set": changes}))
+
+    if operations:
+        await tasks_collection.bulk_write(operations, ordered=False)
+        print(f"🔧 Normalized due dates on {len(operations)} tasks")
+
+def _windows(now: datetime) -> dict:
+    """Per window: stages eligible for it and the due_at range it covers"""
+    today = datetime(now.year, now.month, now.day)
+    return {
+        "overdue": (["upcoming", "overdue"], {"$lt": today}),
+        "upcoming": (["upcoming"], {"$gte": today, "$lt": today + timedelta(days=settings.due_soon_days)}),
+    }
+
+def _digest_message(overdue: list, upcoming: list) -> str:
+    parts = []
+    if overdue:
+        parts.append("Tareas vencidas: " + ", ".join(f"{t['title']} ({t['due_date']})" for t in overdue))
+    if upcoming:
+        parts.append("Próximas a vencer: " + ", ".join(f"{t['title']} ({t['due_date']})" for t in upcoming))
+    return " · ".join(parts)
+
+async def _release_claims(tasks_collection, query: dict):
+    """Undo claims whose digest was never written so the tasks are scanned again"""
+    for window in ("overdue", "upcoming"):
+        await tasks_collection.update_many({**query, "due_claim.window": window}, [
+            {"$set": {"due_notices": {"$setDifference": [{"$ifNull": ["$due_notices", []]}, [window]]}}},
+            {"$set": {"due_stage": STAGE_EXPRESSION}},
+            {"$unset": "due_claim"},
+        ])
+
+async def _settle_run(tasks_collection, notifications_collection, run_id: str):
+    """Keep claims whose digest landed, release the rest for the next scan"""
+    delivered = []
+    async for digest in notifications_collection.find({"due_run": run_id}, {"task_ids": 1}):
+        delivered.extend(digest["task_ids"])
+    await _release_claims(tasks_collection, {"due_claim.run": run_id, "id": {"$nin": delivered}})
+    await tasks_collection.update_many({"due_claim.run": run_id}, {"$unset": {"due_claim": ""}})
+
+async def _recover_stale_claims(tasks_collection, notifications_collection, now: datetime):
+    """Settle claims left behind by a scan that died mid-run"""
+    runs = await tasks_collection.distinct("due_claim.run", {"due_claim.at": {"$lt": now - CLAIM_TIMEOUT}})
+    for run_id in runs:
+        await _settle_run(tasks_collection, notifications_collection, run_id)
+
+async def scan_due_tasks(now: Optional[datetime] = None) -> int:
+    """Notify assignees about overdue and upcoming tasks; returns digests written.
+
+    Tasks are claimed atomically per window (advancing due_stage) before the
+    digests are written, so overlapping scans never notify twice. If writing
+    the digests fails, claims without a delivered digest are rolled back;
+    claims orphaned by a crash are settled the same way by a later scan.
+    """
+    now = now or datetime.utcnow()
+    tasks_collection = await get_tasks_collection()
+    notifications_collection = await get_notifications_collection()
+    await _recover_stale_claims(tasks_collection, notifications_collection, now)
+
+    run_id = uuid.uuid4().hex
+    by_assignee = defaultdict(lambda: {"overdue": [], "upcoming": []})
+    claimed_ids = []
+    for window, (stages, due_range) in _windows(now).items():
+        claim = {"run": run_id, "window": window, "at": now}
+        result = await tasks_collection.update_many(
+            {"due_stage": {"$in": stages}, "due_at": due_range},
+            [
+                {"$set": {
+                    "due_notices": {"$setUnion": [{"$ifNull": ["$due_notices", []]}, [window]]},
+                    "due_claim": {"$literal": claim},
+                }},
+                {"$set": {"due_stage": STAGE_EXPRESSION}},
+            ],
+        )
+        if not result.modified_count:
+            continue
+
+        claimed = tasks_collection.find(
+            {"due_claim.run": run_id, "due_claim.window": window},
+            {"id": 1, "title": 1, "due_date": 1, "due_at": 1, "assigned_to": 1},
+        )
+        async for task in claimed:
+            by_assignee[task["assigned_to"]][window].append(task)
+            claimed_ids.append(task["id"])
+
+    if not by_assignee:
+        return 0
+
+    last = await notifications_collection.find_one(sort=[("id", -1)])
+    next_id = (last["id"] + 1) if last else 1
+    created_at = now.isoformat()
+    digests = []
+    for offset, (user_id, windows) in enumerate(sorted(by_assignee.items())):
+        for tasks in windows.values():
+            tasks.sort(key=lambda t: t["due_at"])
+        digests.append({
+            "id": next_id + offset,
+            "user_id": user_id,
+            "message": _digest_message(windows["overdue"], windows["upcoming"]),
+            "type": "due_digest",
+            "read": False,
+            "created_at": created_at,
+            "task_ids": [t["id"] for t in windows["overdue"] + windows["upcoming"]],
+            "due_run": run_id,
+        })
+
+    try:
+        await notifications_collection.insert_many(digests)
+    except Exception:
+        await _settle_run(tasks_collection, notifications_collection, run_id)
+        raise
+
+    await tasks_collection.update_many({"due_claim.run": run_id}, {"$unset": {"due_claim": ""}})
+    print(f"🔔 Due-date scan notified {len(digests)} users about {len(claimed_ids)} tasks")
+    return len(digests)
@@ -0,0 +1,124 @@
+import asyncio
+from collections import deque
+from datetime import datetime
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, OperationFailure
+from config import settings
+from database import get_database
+from coalescing import coalescer
+from leader import worker_id
+
+class LocalInvalidationBus:
+    """In-process bus for single-worker runs and tests; nothing crosses processes"""
+
+    def __init__(self):
+        # Recent events, kept for inspection in tests
+        self.published = deque(maxlen=100)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, namespace: str):
+        self.published.append(namespace)
+
+class MongoInvalidationBus:
+    """Broadcasts invalidations to every worker through a capped collection.
+
+    Each worker appends {namespace, origin} after a write and tails the
+    collection, evicting local entries for events published by other workers.
+    """
+
+    def __init__(self, collection_name: str = "cache_events", size_bytes: int = 1024 * 1024):
+        self.collection_name = collection_name
+        self.size_bytes = size_bytes
+        self._events = None
+        self._listener = None
+
+    async def start(self):
+        database = await get_database()
+        try:
+            await database.create_collection(self.collection_name, capped=True, size=self.size_bytes)
+        except CollectionInvalid:
+            pass
+        except OperationFailure as exc:
+            # NamespaceExists: another worker created it between the existence check and create
+            if exc.code != 48:
+                raise
+        events = database[self.collection_name]
+        options = await events.options()
+        if not options.get("capped"):
+            raise RuntimeError(
+                f"Collection '{self.collection_name}' exists but is not capped; "
+                "tailable cursors need a capped collection. Drop it or run "
+                "convertToCapped before starting with INVALIDATION_BUS=mongo."
+            )
+        self._events = events
+
+        # Tailable cursors die on an empty collection, so always leave one event,
+        # and start tailing from it
+        await self.publish("")
+        newest = await events.find_one({}, sort=[("$natural", -1)])
+        self._listener = asyncio.create_task(self._listen(newest["_id"]), name="invalidation-bus")
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+
+    async def publish(self, namespace: str):
+        await self._events.insert_one({"namespace": namespace, "origin": worker_id(), "at": datetime.utcnow()})
+
+    async def _listen(self, last_id):
+        """Tail events in natural (insertion) order, resuming after last_id.
+
+        ObjectIds from different processes are not ordered within a second, so
+        after a reconnect the collection is re-read in natural order and events
+        are skipped up to the last one seen. If that event has already rolled
+        off the capped collection, everything local is invalidated instead.
+        """
+        while True:
+            try:
+                if await self._events.find_one({"_id": last_id}, {"_id": 1}):
+                    seen_last = False
+                else:
+                    coalescer.invalidate_all()
+                    seen_last = True
+
+                cursor = self._events.find({}, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    async for event in cursor:
+                        if not seen_last:
+                            seen_last = event["_id"] == last_id
+                            continue
+                        last_id = event["_id"]
+                        if event["namespace"] and event["origin"] != worker_id():
+                            coalescer.invalidate(event["namespace"])
+                    await asyncio.sleep(0.1)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"⚠️ Invalidation bus listener error: {exc}")
+            await asyncio.sleep(1)
+
+def create_bus():
+    if settings.invalidation_bus == "mongo":
+        return MongoInvalidationBus()
+    return LocalInvalidationBus()
+
+bus = create_bus()
+
+async def invalidate(namespace: str):
+    """Evict local coalesced reads for a namespace and tell the other workers.
+
+    Publishing is best-effort: the write it follows has already committed, so a
+    bus failure must not fail the request.
+    """
+    coalescer.invalidate(namespace)
+    try:
+        await bus.publish(namespace)
+    except Exception as exc:
+        print(f"⚠️ Could not publish invalidation for {namespace}: {exc}")
+        coalescer.invalidate_all()
@@ -0,0 +1,44 @@
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from pymongo.errors import DuplicateKeyError
+from database import get_locks_collection
+
+_worker_ids = {}
+
+def worker_id() -> str:
+    """Identify this process among the workers sharing the database.
+
+    Keyed on the pid so workers forked after import (gunicorn --preload)
+    each get their own ID instead of inheriting the parent's.
+    """
+    pid = os.getpid()
+    if pid not in _worker_ids:
+        _worker_ids[pid] = f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:6]}"
+    return _worker_ids[pid]
+
+async def acquire_lease(name: str, ttl_seconds: float) -> bool:
+    """Take or renew a named lease; only one worker holds it until it expires"""
+    locks_collection = await get_locks_collection()
+    now = datetime.utcnow()
+    owner = worker_id()
+    try:
+        await locks_collection.find_one_and_update(
+            {"_id": name, "$or": [{"owner": owner}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # The lease exists and another live worker owns it
+        return False
+    return True
+
+async def release_leases(name: Optional[str] = None):
+    """Give up one (or every) lease this worker holds so another can take over immediately"""
+    locks_collection = await get_locks_collection()
+    query = {"owner": worker_id()}
+    if name:
+        query["_id"] = name
+    await locks_collection.delete_many(query)
@@ -3,22 +3,38 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi import APIRouter, Depends, HTTPException, status
 from contextlib import asynccontextmanager
+from pymongo.errors import DuplicateKeyError
 
 from config import settings
 from database import connect_to_mongo, close_mongo_connection, get_users_collection
-from auth import verify_password, create_access_token, get_password_hash
+from auth import verify_password, create_access_token, get_password_hash, get_current_user
 from models import UserLogin, Token
+from coalescing import coalescer
+from rollups import ensure_workload_indexes, reconcile_workload, seed_workload
+from scheduler import start_periodic, stop_all
+from due_dates import ensure_due_date_indexes, migrate_due_dates, scan_due_tasks
+from leader import acquire_lease, release_leases
+from invalidation import bus
 
 # Import routes
-from routes import tasks, projects, comments, history, notifications, users
+from routes import tasks, projects, comments, history, notifications, users, workload
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
     await initialize_default_data()
+    await run_migrations()
+    await bus.start()
+    jobs = [
+        start_periodic("workload-reconcile", settings.workload_reconcile_interval_seconds, reconcile_workload),
+        start_periodic("due-date-scan", settings.due_scan_interval_seconds, scan_due_tasks),
+    ]
     yield
     # Shutdown
+    await stop_all(jobs)
+    await bus.stop()
+    await release_leases()
     await close_mongo_connection()
 
 app = FastAPI(
@@ -70,6 +86,13 @@ app.include_router(comments.router)
 app.include_router(history.router)
 app.include_router(notifications.router)
 app.include_router(users.router)
+app.include_router(workload.router)
+
+# Registered before the static mount so "/" does not shadow it
+@app.get("/api/metrics/coalescing")
+async def coalescing_metrics(current_user: dict = Depends(get_current_user)):
+    """Read coalescing counters (deduplicated requests, cache hits, in-flight calls)"""
+    return coalescer.metrics()
 
 # Serve static files (frontend)
 app.mount("/", StaticFiles(directory="../", html=True), name="static")
@@ -77,23 +100,48 @@ app.mount("/", StaticFiles(directory="../", html=True), name="static")
 from database import get_projects_collection
 
 async def initialize_default_data():
-    """Initialize database with default data"""
+    """Initialize database with default data (safe to run from every worker)"""
     users_collection = await get_users_collection()
     projects_collection = await get_projects_collection()
     
+    # Unique index makes concurrent seeding from several workers collapse to one row
+    await users_collection.create_index("username", unique=True)
+    
     # Check if data already exists
-    user_count = await users_collection.count_documents({})
+    user_count = await users_collection.count_documents({}, limit=1)
     if user_count > 0:
         print("✅ Database already initialized")
         return
     
     print("🔧 Initializing default data...")
     
-    # Create admin user only
+    # Create admin user only; another worker may win the race, which is fine
     admin_user = {"id": 1, "username": "admin", "hashed_password": get_password_hash("admin")}
-    await users_collection.insert_one(admin_user)
+    try:
+        result = await users_collection.update_one(
+            {"username": "admin"}, {"$setOnInsert": admin_user}, upsert=True
+        )
+    except DuplicateKeyError:
+        result = None
+    
+    if result and result.upserted_id:
+        print("✅ Default data initialized (Admin user created)")
+    else:
+        print("✅ Database already initialized")
+
+async def run_migrations():
+    """Create indexes and backfill data once, on whichever worker wins the lease"""
+    if not await acquire_lease("startup-migrations", 300):
+        print("⏭️ Migrations handled by another worker")
+        return
     
-    print("✅ Default data initialized (Admin user created)")
+    try:
+        await ensure_workload_indexes()
+        await seed_workload()
+        await ensure_due_date_indexes()
+        await migrate_due_dates()
+    finally:
+        await release_leases("startup-migrations")
 
 @app.get("/api/health")
 async def health_check():
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 # User Models
@@ -117,6 +117,30 @@ class Notification(NotificationBase):
     class Config:
         from_attributes = True
 
+# Workload Models
+class WorkloadRollup(BaseModel):
+    key: int
+    task_count: int = 0
+    open_tasks: int = 0
+    estimated_hours: float = 0.0
+    actual_hours: float = 0.0
+
+class Workload(BaseModel):
+    assignees: List[WorkloadRollup] = []
+    projects: List[WorkloadRollup] = []
+
+class WorkloadDrift(BaseModel):
+    dimension: str
+    key: int
+    expected: dict
+    actual: dict
+    corrected: bool = False
+
+class ReconcileReport(BaseModel):
+    checked: int
+    drifted: List[WorkloadDrift] = []
+    checked_at: str
+
 # Token Models
 class Token(BaseModel):
     access_token: str
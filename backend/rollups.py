@@ -0,0 +1,161 @@
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from pymongo import ASCENDING, UpdateOne
+from database import get_tasks_collection, get_workload_collection
+
+# Rollups are kept per assignee and per project: {dimension, key, counters...}
+DIMENSIONS = {"assignee": "assigned_to", "project": "project_id"}
+COUNTERS = ("task_count", "open_tasks", "estimated_hours", "actual_hours")
+DONE_STATUS = "Completada"
+# Float $inc deltas accumulate rounding noise; ignore differences below this
+DRIFT_TOLERANCE = 1e-6
+
+def task_contribution(task: dict) -> Dict[str, float]:
+    """Counters a single task adds to each of its rollups"""
+    return {
+        "task_count": 1,
+        "open_tasks": 0 if task.get("status") == DONE_STATUS else 1,
+        "estimated_hours": float(task.get("estimated_hours") or 0.0),
+        "actual_hours": float(task.get("actual_hours") or 0.0),
+    }
+
+def rollup_deltas(old_task: Optional[dict], new_task: Optional[dict]) -> Dict[Tuple[str, int], Dict[str, float]]:
+    """Compute $inc deltas per (dimension, key) for a task going from old to new"""
+    deltas: Dict[Tuple[str, int], Dict[str, float]] = {}
+    for task, sign in ((old_task, -1), (new_task, 1)):
+        if not task:
+            continue
+        contribution = task_contribution(task)
+        for dimension, field in DIMENSIONS.items():
+            entry = deltas.setdefault((dimension, int(task.get(field) or 0)), dict.fromkeys(COUNTERS, 0))
+            for counter, value in contribution.items():
+                entry[counter] += sign * value
+
+    return {
+        target: {counter: value for counter, value in entry.items() if abs(value) > DRIFT_TOLERANCE}
+        for target, entry in deltas.items()
+        if any(abs(value) > DRIFT_TOLERANCE for value in entry.values())
+    }
+
+async def apply_task_change(old_task: Optional[dict], new_task: Optional[dict]):
+    """Incrementally update rollups after a task is created, updated or deleted"""
+    deltas = rollup_deltas(old_task, new_task)
+    if not deltas:
+        return
+
+    workload_collection = await get_workload_collection()
+    await workload_collection.bulk_write([
+        UpdateOne({"dimension": dimension, "key": key}, {"$inc": entry}, upsert=True)
+        for (dimension, key), entry in deltas.items()
+    ], ordered=False)
+
+async def ensure_workload_indexes():
+    workload_collection = await get_workload_collection()
+    await workload_collection.create_index([("dimension", ASCENDING), ("key", ASCENDING)], unique=True)
+
+async def get_workload() -> dict:
+    """Read the rollups only; cost is O(users + projects)"""
+    workload_collection = await get_workload_collection()
+    rollups = await workload_collection.find({"task_count": {"$gt": 0}}).sort("key", 1).to_list(None)
+    return {
+        "assignees": [r for r in rollups if r["dimension"] == "assignee"],
+        "projects": [r for r in rollups if r["dimension"] == "project"],
+    }
+
+def _group_stage(field: str) -> dict:
+    return {"$group": {
+        "_id": {"$ifNull": ["$" + field, 0]},
+        "task_count": {"$sum": 1},
+        "open_tasks": {"$sum": {"$cond": [{"$eq": ["$status", DONE_STATUS]}, 0, 1]}},
+        "estimated_hours": {"$sum": {"$ifNull": ["$estimated_hours", 0]}},
+        "actual_hours": {"$sum": {"$ifNull": ["$actual_hours", 0]}},
+    }}
+
+def _same_drift(previous: Optional[dict], diff: Dict[str, float]) -> bool:
+    if not previous or previous.keys() != diff.keys():
+        return False
+    return all(abs(previous[c] - diff[c]) <= DRIFT_TOLERANCE for c in diff)
+
+async def _expected_rollups() -> Dict[Tuple[str, int], Dict[str, float]]:
+    """Recompute every rollup from the tasks collection in one aggregate"""
+    tasks_collection = await get_tasks_collection()
+    pipeline = [{"$facet": {dimension: [_group_stage(field)] for dimension, field in DIMENSIONS.items()}}]
+    facets = (await tasks_collection.aggregate(pipeline).to_list(1))[0]
+
+    expected = {}
+    for dimension in DIMENSIONS:
+        for group in facets[dimension]:
+            expected[(dimension, int(group["_id"]))] = {counter: group[counter] for counter in COUNTERS}
+    return expected
+
+async def reconcile_workload() -> dict:
+    """Recompute rollups from the tasks collection, report drift and correct it.
+
+    A delta that lands between the aggregate and the rollup read looks like
+    drift once, so an entry is corrected only when the same difference is
+    seen on two consecutive runs (kept in pending_drift). The correction is
+    an $inc conditioned on that pending_drift, so of two overlapping runs
+    only one applies it, and concurrent deltas are preserved.
+    """
+    workload_collection = await get_workload_collection()
+    expected = await _expected_rollups()
+
+    actual = {}
+    pending = {}
+    async for rollup in workload_collection.find({}):
+        target = (rollup["dimension"], rollup["key"])
+        actual[target] = {counter: rollup.get(counter, 0) for counter in COUNTERS}
+        pending[target] = rollup.get("pending_drift")
+
+    drifted = []
+    operations = []
+    zero = dict.fromkeys(COUNTERS, 0)
+    for target in expected.keys() | actual.keys():
+        dimension, key = target
+        selector = {"dimension": dimension, "key": key}
+        want = expected.get(target, zero)
+        have = actual.get(target, zero)
+        diff = {c: want[c] - have[c] for c in COUNTERS if abs(want[c] - have[c]) > DRIFT_TOLERANCE}
+        if not diff:
+            if pending.get(target):
+                operations.append(UpdateOne(selector, {"$unset": {"pending_drift": ""}}))
+            continue
+
+        corrected = _same_drift(pending.get(target), diff)
+        if corrected:
+            operations.append(UpdateOne(
+                {**selector, "pending_drift": pending[target]},
+                {"$inc": diff, "$unset": {"pending_drift": ""}},
+            ))
+        else:
+            operations.append(UpdateOne(selector, {"$set": {"pending_drift": diff}}, upsert=True))
+        drifted.append({"dimension": dimension, "key": key, "expected": want, "actual": have, "corrected": corrected})
+
+    if operations:
+        await workload_collection.bulk_write(operations, ordered=False)
+
+    corrected_count = sum(1 for d in drifted if d["corrected"])
+    if drifted:
+        print(f"⚠️ Workload rollups drifted on {len(drifted)} entries ({corrected_count} corrected)")
+    else:
+        print("✅ Workload rollups in sync")
+
+    return {"checked": len(expected.keys() | actual.keys()), "drifted": drifted, "checked_at": datetime.utcnow().isoformat()}
+
+async def seed_workload():
+    """Build the rollups for existing tasks when the collection is still empty.
+
+    Rows are only ever inserted ($setOnInsert), never overwritten, so deltas
+    from workers already serving writes are not reversed; any overlap is left
+    for reconcile to confirm and correct.
+    """
+    workload_collection = await get_workload_collection()
+    if await workload_collection.count_documents({}, limit=1) > 0:
+        return
+    print("🔧 Seeding workload rollups...")
+    expected = await _expected_rollups()
+    if expected:
+        await workload_collection.bulk_write([
+            UpdateOne({"dimension": dimension, "key": key}, {"$setOnInsert": counters}, upsert=True)
+            for (dimension, key), counters in expected.items()
+        ], ordered=False)
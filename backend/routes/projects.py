@@ -1,17 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
+from pydantic import TypeAdapter
 from models import Project, ProjectCreate, ProjectUpdate
 from database import get_projects_collection
 from auth import get_current_user
+from coalescing import coalescer, serialize, json_response
+from invalidation import invalidate
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
+projects_adapter = TypeAdapter(List[Project])
+
 @router.get("", response_model=List[Project])
 async def get_projects(current_user: dict = Depends(get_current_user)):
     """Get all projects"""
-    projects_collection = await get_projects_collection()
-    projects = await projects_collection.find().to_list(1000)
-    return projects
+    async def load():
+        projects_collection = await get_projects_collection()
+        projects = await projects_collection.find().to_list(1000)
+        return serialize(projects_adapter, projects)
+    
+    return json_response(await coalescer.fetch("projects", {}, load))
 
 @router.post("", response_model=Project, status_code=status.HTTP_201_CREATED)
 async def create_project(
@@ -30,6 +38,7 @@ async def create_project(
     project_dict["id"] = next_id
     
     await projects_collection.insert_one(project_dict)
+    await invalidate("projects")
     
     return project_dict
 
@@ -52,6 +61,7 @@ async def update_project(
     project_dict["id"] = project_id
     
     await projects_collection.replace_one({"id": project_id}, project_dict)
+    await invalidate("projects")
     
     return project_dict
 
@@ -70,5 +80,6 @@ async def delete_project(
     
     # Delete project
     await projects_collection.delete_one({"id": project_id})
+    await invalidate("projects")
     
     return None
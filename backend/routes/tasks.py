@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Optional
 from datetime import datetime
+from pydantic import TypeAdapter
+from pymongo import ReturnDocument
 from models import Task, TaskCreate, TaskUpdate
 from database import get_tasks_collection, get_history_collection, get_notifications_collection
 from auth import get_current_user
+from coalescing import coalescer, serialize, json_response
+from invalidation import invalidate
+from rollups import apply_task_change
+from due_dates import apply_due_date, new_task_tracking, task_update_pipeline
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
+tasks_adapter = TypeAdapter(List[Task])
+
 @router.get("", response_model=List[Task])
 async def get_tasks(
     status: Optional[str] = None,
@@ -15,8 +23,6 @@ async def get_tasks(
     current_user: dict = Depends(get_current_user)
 ):
     """Get all tasks with optional filters"""
-    tasks_collection = await get_tasks_collection()
-    
     query = {}
     if status:
         query["status"] = status
@@ -25,8 +31,12 @@ async def get_tasks(
     if project_id:
         query["project_id"] = project_id
     
-    tasks = await tasks_collection.find(query).to_list(1000)
-    return tasks
+    async def load():
+        tasks_collection = await get_tasks_collection()
+        tasks = await tasks_collection.find(query).to_list(1000)
+        return serialize(tasks_adapter, tasks)
+    
+    return json_response(await coalescer.fetch("tasks", query, load))
 
 @router.post("", response_model=Task, status_code=status.HTTP_201_CREATED)
 async def create_task(
@@ -52,8 +62,11 @@ async def create_task(
         "created_at": now,
         "updated_at": now
     })
+    new_task_tracking(apply_due_date(task_dict))
     
     await tasks_collection.insert_one(task_dict)
+    await apply_task_change(None, task_dict)
+    await invalidate("tasks")
     
     # Add history
     await history_collection.insert_one({
@@ -104,23 +117,26 @@ async def update_task(
     history_collection = await get_history_collection()
     notifications_collection = await get_notifications_collection()
     
-    # Get old task
-    old_task = await tasks_collection.find_one({"id": task_id})
-    if not old_task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
     # Update task
     now = datetime.utcnow().isoformat()
     task_dict = task_update.model_dump()
     task_dict.update({
         "id": task_id,
-        "actual_hours": old_task.get("actual_hours", 0.0),
-        "created_by": old_task["created_by"],
-        "created_at": old_task["created_at"],
         "updated_at": now
     })
-    
-    await tasks_collection.replace_one({"id": task_id}, task_dict)
+    apply_due_date(task_dict)
+    
+    # Only user fields are set; due-date scanner state is kept atomically.
+    # The pre-image is what this write actually replaced, so rollup deltas
+    # stay exact under concurrent updates and deletes.
+    old_task = await tasks_collection.find_one_and_update(
+        {"id": task_id}, task_update_pipeline(task_dict), return_document=ReturnDocument.BEFORE
+    )
+    if not old_task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    task_dict = {**old_task, **task_dict}
+    await apply_task_change(old_task, task_dict)
+    await invalidate("tasks")
     
     # Add history for status change
     if old_task["status"] != task_update.status:
@@ -168,10 +184,12 @@ async def delete_task(
     tasks_collection = await get_tasks_collection()
     history_collection = await get_history_collection()
     
-    # Get task
-    task = await tasks_collection.find_one({"id": task_id})
+    # Delete task; only the request that actually removed it updates rollups
+    task = await tasks_collection.find_one_and_delete({"id": task_id})
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    await apply_task_change(task, None)
+    await invalidate("tasks")
     
     # Add history
     await history_collection.insert_one({
@@ -184,9 +202,6 @@ async def delete_task(
         "timestamp": datetime.utcnow().isoformat()
     })
     
-    # Delete task
-    await tasks_collection.delete_one({"id": task_id})
-    
     return None
 
 # Helper functions
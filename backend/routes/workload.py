@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+from models import Workload, ReconcileReport
+from auth import get_current_user, get_admin_user
+from rollups import get_workload, reconcile_workload
+
+router = APIRouter(prefix="/api/workload", tags=["workload"])
+
+@router.get("", response_model=Workload)
+async def read_workload(current_user: dict = Depends(get_current_user)):
+    """Estimated/actual hours and open tasks per assignee and project"""
+    return await get_workload()
+
+@router.post("/reconcile", response_model=ReconcileReport)
+async def run_reconciliation(current_user: dict = Depends(get_admin_user)):
+    """Reconcile the rollups against tasks now and report drift (admins only)"""
+    return await reconcile_workload()
@@ -0,0 +1,26 @@
+import asyncio
+from typing import Awaitable, Callable
+from leader import acquire_lease
+
+async def run_periodically(name: str, interval_seconds: float, job: Callable[[], Awaitable]):
+    """Run a background job every interval until cancelled.
+
+    Each run is gated on a lease named after the job, so with several workers
+    only one of them executes it per interval.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            if not await acquire_lease(name, interval_seconds * 2):
+                continue
+            await job()
+        except Exception as exc:
+            print(f"⚠️ Scheduled job {name} failed: {exc}")
+
+def start_periodic(name: str, interval_seconds: float, job: Callable[[], Awaitable]) -> asyncio.Task:
+    return asyncio.create_task(run_periodically(name, interval_seconds, job), name=name)
+
+async def stop_all(jobs):
+    for job in jobs:
+        job.cancel()
+    await asyncio.gather(*jobs, return_exceptions=True)
@@ -0,0 +1,36 @@
+"""Launch the API with one worker per available CPU.
+
+    python serve.py                # workers = usable CPUs
+    WEB_CONCURRENCY=4 python serve.py
+
+With more than one worker the Mongo invalidation bus is enabled so every
+worker evicts coalesced reads after writes made through the others.
+"""
+import os
+import uvicorn
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects affinity/cpuset limits)"""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+def worker_count() -> int:
+    configured = os.environ.get("WEB_CONCURRENCY")
+    if configured:
+        return max(1, int(configured))
+    return available_cpus()
+
+if __name__ == "__main__":
+    workers = worker_count()
+    if workers > 1:
+        # Read by config.Settings in each worker process
+        os.environ.setdefault("INVALIDATION_BUS", "mongo")
+
+    print(f"🚀 Starting {workers} worker(s)")
+    uvicorn.run(
+        "main:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", "8000")),
+        workers=workers,
+    )